@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+This is an example where pigpio on a Raspberry Pi captures IR edges in one process and other processes decode them.
+The capture process only writes edge ticks to a CaptureWriter so decoding and application code can not delay it.
+Please see pigpio documentation for information on how to set it up.
+Run with --simulate to use SimulatedEdgeSource in place of a receiver.
+"""
+
+import multiprocessing
+import sys
+import time
+
+import irreceiver
+from irreceiver.capture import CaptureWriter, SimulatedEdgeSource, decode_worker
+
+# A repeat message returns the last code decoded by the same worker, so with more than one worker sharing the frames
+# a repeat message can return the code of a different remote button
+WORKER_COUNT = 1
+
+# Longer than any pulse in a frame and shorter than the gap before a repeat message
+FRAME_GAP_MS = 20
+
+
+def print_codes(codes: multiprocessing.Queue):
+    """
+    Print codes as the decode workers find them
+
+    Args:
+        codes: The queue the workers put codes on
+    """
+
+    while True:
+        code = codes.get()
+
+        # A repeat message before any new message decodes to None
+        if code is None:
+            continue
+
+        print('Invalid code') if code == irreceiver.INVALID_FRAME else print(
+            hex(code))
+
+
+def main():
+    """Capture on a Raspberry PI (or a simulated receiver) and decode in worker processes"""
+
+    writer = CaptureWriter()
+    codes = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    workers = [
+        multiprocessing.Process(target=decode_worker,
+                                args=(writer.name, codes, stop, index,
+                                      WORKER_COUNT))
+        for index in range(WORKER_COUNT)
+    ]
+    for worker in workers:
+        worker.start()
+    printer = multiprocessing.Process(target=print_codes,
+                                      args=(codes, ),
+                                      daemon=True)
+    printer.start()
+
+    # Give the workers time to attach so they see the first frame
+    time.sleep(1)
+
+    print('Press Ctrl-c to exit')
+
+    try:
+        if '--simulate' in sys.argv:
+            encoder = irreceiver.NecEncoder()
+            frames = [encoder.encode(0x00, command) for command in range(16)]
+            SimulatedEdgeSource(frames, jitter=.1).run(writer)
+            time.sleep(1)
+        else:
+            import pigpio
+
+            # Set up GPIO on raspberry pi, the watchdog ends each frame once there are no more edges
+            ir_pin = 14
+            pi = pigpio.pi()
+            pi.set_mode(ir_pin, pigpio.INPUT)
+            pi.set_watchdog(ir_pin, FRAME_GAP_MS)
+            _ = pi.callback(ir_pin, pigpio.EITHER_EDGE, writer.capture)
+
+            while True:
+                time.sleep(1)
+
+    except KeyboardInterrupt:
+        print('Stopping')
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+    writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """
 This is an example where pigpio on a Raspberry Pi is used to receive an IR message.
 pigpio detects the events, PiPulseCollector collects them and NecDecoder decodes them.
+Decoded codes are passed to a Dispatcher so the handlers run on a worker thread and not in the pigpio callback.
 Please see pigpio documentation for information on how to set it up.
 Other code would be placed in the try block which keeps this program from exiting on the Pi.
 """
@@ -70,7 +71,7 @@ class PiPulseCollector:
 def ir_callback(code: int):
     """
     Simple demonstration callback function
-    In this example it is called by the PulseCollector when the signal has been successfully decoded
+    In this example it is called by the Dispatcher for every code without a registered handler
 
     Args:
         code: The decoded signal
@@ -80,6 +81,17 @@ def ir_callback(code: int):
         hex(code))
 
 
+def volume_up(code: int):
+    """
+    Demonstration handler registered for a single address and command
+
+    Args:
+        code: The decoded signal
+    """
+
+    print('Volume up', hex(code))
+
+
 def main():
     """Run a simple example that prints IR codes received on a Raspberry PI"""
 
@@ -89,8 +101,11 @@ def main():
     pi.set_mode(ir_pin, pigpio.INPUT)
 
     decoder = irreceiver.NecDecoder()
+    dispatcher = irreceiver.Dispatcher(policy=irreceiver.COALESCE,
+                                       default_handler=ir_callback)
+    dispatcher.register(0x7A, 0x1A, volume_up)
     collector = PiPulseCollector(
-        pi, ir_pin, ir_callback,
+        pi, ir_pin, dispatcher.dispatch,
         irreceiver.FRAME_TIME_MS + irreceiver.TIMING_TOLERANCE, decoder)
     _ = pi.callback(ir_pin, pigpio.EITHER_EDGE, collector.collect_pulses)
 
@@ -105,6 +120,7 @@ def main():
     except KeyboardInterrupt:
         print('Stopping')
         pi.stop()
+        dispatcher.close()
 
 
 if __name__ == "__main__":
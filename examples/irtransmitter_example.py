@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+This is an example where pigpio on a Raspberry Pi is used to send an IR message.
+NecEncoder creates the message and PiWaveSink turns it into a pigpio wave with a 38kHz carrier.
+Please see pigpio documentation for information on how to set it up.
+"""
+
+import time
+
+import pigpio
+
+import irreceiver
+
+CARRIER_FREQUENCY = 38000
+DUTY_CYCLE = .33
+REPEAT_PERIOD_MS = 108
+# A message takes about 68ms to send so checking every millisecond is soon enough without using a whole CPU core
+WAIT_INTERVAL = .001
+
+
+class PiWaveSink(irreceiver.WaveformSink):
+    """
+    This class sends messages as pigpio waves.
+    Waves are kept so sending the same message again only needs wave_send_once
+    """
+    def __init__(self, pi: pigpio.pi, transmit_pin: int):
+        self.pi = pi
+        self.transmit_pin = transmit_pin
+        self.wave_ids = {}
+
+    def _create_wave(self, durations) -> int:
+        """
+        Create a pigpio wave where each mark is a burst of the carrier and each space is off
+
+        Args:
+            durations: An array of alternating mark and space times starting with a mark
+
+        Returns:
+            The pigpio wave id
+        """
+
+        pin_mask = 1 << self.transmit_pin
+        period = 1000000 / CARRIER_FREQUENCY
+        on_time = round(period * DUTY_CYCLE)
+        off_time = round(period) - on_time
+
+        pulses = []
+        for index, duration in enumerate(durations):
+            if index % 2 == 0:
+                for _ in range(round(duration / period)):
+                    pulses.append(pigpio.pulse(pin_mask, 0, on_time))
+                    pulses.append(pigpio.pulse(0, pin_mask, off_time))
+            else:
+                pulses.append(pigpio.pulse(0, pin_mask, round(duration)))
+
+        self.pi.wave_add_generic(pulses)
+        return self.pi.wave_create()
+
+    def send(self, durations):
+        key = durations.tobytes()
+        wave_id = self.wave_ids.get(key)
+        if wave_id is None:
+            wave_id = self._create_wave(durations)
+            self.wave_ids[key] = wave_id
+
+        self.pi.wave_send_once(wave_id)
+        while self.pi.wave_tx_busy():
+            time.sleep(WAIT_INTERVAL)
+
+    def close(self):
+        """Delete the pigpio waves"""
+
+        for wave_id in self.wave_ids.values():
+            self.pi.wave_delete(wave_id)
+        self.wave_ids = {}
+
+
+def main():
+    """Send a message followed by a repeat message from a Raspberry PI"""
+
+    # Set up GPIO on raspberry pi
+    ir_pin = 18
+    pi = pigpio.pi()
+    pi.set_mode(ir_pin, pigpio.OUTPUT)
+
+    encoder = irreceiver.NecEncoder()
+    sink = PiWaveSink(pi, ir_pin)
+
+    encoder.send(sink, 0x00, 0xAD)
+
+    # A repeat message starts 108ms after the start of the message and send returns once the message is done
+    time.sleep((REPEAT_PERIOD_MS - irreceiver.FRAME_TIME_MS) / 1000)
+    encoder.send_repeat(sink)
+
+    sink.close()
+    pi.stop()
+
+
+if __name__ == "__main__":
+    main()
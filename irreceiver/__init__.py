@@ -1,4 +1,8 @@
 __version__ = '0.9.5'
 
 from irreceiver.irreceiver import NecDecoder, INVALID_FRAME, REPEAT_MESSAGE, NEW_MESSAGE, FRAME_TIME_MS, \
-    TIMING_TOLERANCE
+    TIMING_TOLERANCE, NEC_STANDARD, NEC_EXTENDED
+from irreceiver.dispatcher import Dispatcher, HandlerStats, DROP_NEWEST, DROP_OLDEST, COALESCE
+from irreceiver.filters import GlitchFilter, filter_glitches, MIN_PULSE_WIDTH
+from irreceiver.monitor import LinkMonitor, LinkStats, RunningStats
+from irreceiver.encoder import NecEncoder, WaveformSink, FileSink
@@ -0,0 +1,374 @@
+"""
+This is a shared memory bus between a process which captures IR edges and processes which decode them.
+
+The capture process only stores the tick of each edge so application code in other processes can not delay it.
+Decode workers attach to the bus by name and read each frame directly from the shared memory.
+
+Layout of the shared memory (little endian):
+- A header of the edge capacity, the frame capacity, the edge sequence and the frame sequence
+- A ring of frame records, each the sequence of the first edge of the frame and of the edge after it
+- A ring of edge ticks as unsigned 32-bit microseconds which wrap around like pigpio ticks
+
+The sequences count every edge and frame ever written, so the slot of edge n is n % edge_capacity.
+The writer stores the data before the sequence that publishes it, so the slot of the next edge or frame may already be
+changing. A reader treats that slot as overwritten, so a ring keeps at most capacity - 1 edges or frames.
+Python does not order memory accesses between processes. On CPUs with weak memory ordering such as ARM a reader may
+see a sequence before the data it publishes, so a frame can still be corrupt. The decoder rejects most of these frames.
+
+Overflow: the writer never waits for readers. When a ring is full the oldest edges and frames are overwritten.
+A frame with as many edges as the edge ring or more is dropped when it ends.
+
+Lagging readers: each reader has its own frame sequence. If the writer has moved frame_capacity - 1 frames ahead or more
+the reader skips to the oldest frame that is still in the ring. If the edges of a frame are overwritten while it is
+being read the frame is dropped. Skipped and dropped frames are counted in dropped_frames.
+Several workers can share the frames by each taking every worker_count-th frame, or every reader can see every frame.
+Each worker has its own NecDecoder so when frames are shared a repeat message returns the last code of that worker.
+
+Lifetime: the writer owns the shared memory and removes it when it is closed. Readers do not register it with the
+multiprocessing resource tracker, which would otherwise remove it when a reader process started on its own exits.
+"""
+
+import random
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from irreceiver.irreceiver import NecDecoder
+
+EDGE_CAPACITY = 4096
+FRAME_CAPACITY = 256
+TICK_MASK = 0xFFFFFFFF
+TIMEOUT = 2
+POLL_INTERVAL = .001
+
+_HEADER = struct.Struct('<IIQQ')
+_SEQUENCES_OFFSET = 8
+_SEQUENCES = struct.Struct('<QQ')
+_FRAME = struct.Struct('<QQ')
+_TICK = struct.Struct('<I')
+
+
+def _layout(frame_capacity: int) -> tuple:
+    frames_offset = _HEADER.size
+    edges_offset = frames_offset + frame_capacity * _FRAME.size
+    return frames_offset, edges_offset
+
+
+class FramePulses:
+    """
+    The pulse times of one frame, calculated from the edge ticks in shared memory when they are read.
+    This can be passed to NecDecoder.decode in place of a list
+    """
+    def __init__(self, buffer, edges_offset: int, edge_capacity: int,
+                 first_edge: int, end_edge: int):
+        self._buffer = buffer
+        self._edges_offset = edges_offset
+        self._edge_capacity = edge_capacity
+        self.first_edge = first_edge
+        self._length = max(end_edge - first_edge - 1, 0)
+
+    def _tick(self, edge: int) -> int:
+        return _TICK.unpack_from(
+            self._buffer,
+            self._edges_offset + (edge % self._edge_capacity) * _TICK.size)[0]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('pulse index out of range')
+
+        edge = self.first_edge + index
+        return (self._tick(edge + 1) - self._tick(edge)) & TICK_MASK
+
+
+class CaptureWriter:
+    """
+    Create a capture bus and write edges to it. There must be only one writer for a bus
+    """
+    def __init__(self,
+                 name: str = None,
+                 edge_capacity: int = EDGE_CAPACITY,
+                 frame_capacity: int = FRAME_CAPACITY):
+        self.edge_capacity = edge_capacity
+        self.frame_capacity = frame_capacity
+        self._frames_offset, self._edges_offset = _layout(frame_capacity)
+        self._memory = shared_memory.SharedMemory(
+            name, True, self._edges_offset + edge_capacity * _TICK.size)
+        self.name = self._memory.name
+        self._edge_sequence = 0
+        self._frame_sequence = 0
+        self._frame_start = 0
+        _HEADER.pack_into(self._memory.buf, 0, edge_capacity, frame_capacity,
+                          0, 0)
+
+    def add_edge(self, tick: int):
+        """
+        Add an edge to the current frame
+
+        Args:
+            tick: The number of microseconds between boot and this edge
+        """
+
+        _TICK.pack_into(
+            self._memory.buf, self._edges_offset +
+            (self._edge_sequence % self.edge_capacity) * _TICK.size,
+            tick & TICK_MASK)
+        self._edge_sequence += 1
+        _SEQUENCES.pack_into(self._memory.buf, _SEQUENCES_OFFSET,
+                             self._edge_sequence, self._frame_sequence)
+
+    def end_frame(self):
+        """Publish the edges added since the last frame as a frame, frames with fewer than two edges are ignored"""
+
+        edges = self._edge_sequence - self._frame_start
+        if 2 <= edges < self.edge_capacity:
+            _FRAME.pack_into(
+                self._memory.buf, self._frames_offset +
+                (self._frame_sequence % self.frame_capacity) * _FRAME.size,
+                self._frame_start, self._edge_sequence)
+            self._frame_sequence += 1
+            _SEQUENCES.pack_into(self._memory.buf, _SEQUENCES_OFFSET,
+                                 self._edge_sequence, self._frame_sequence)
+
+        self._frame_start = self._edge_sequence
+
+    def capture(self, _, level: int, tick: int):
+        """
+        Record an event in the same form as a pigpio callback, so this can be passed to pigpio.callback with a watchdog
+
+        Args:
+            _: (unused) The pin number which is passed by the pigpio callback
+            level: 0 or 1 for an edge and TIMEOUT (the same as pigpio.TIMEOUT) when the frame is over
+            tick: The number of microseconds between boot and this event
+        """
+
+        if level == TIMEOUT:
+            self.end_frame()
+        else:
+            self.add_edge(tick)
+
+    def close(self):
+        """Close and remove the bus"""
+
+        # A reader in this process or a forked child shares the resource tracker and may have unregistered the bus
+        resource_tracker.register(self._memory._name, 'shared_memory')
+        self._memory.close()
+        self._memory.unlink()
+
+
+class CaptureReader:
+    """
+    Attach to a capture bus and read the frames.
+    The reader takes frames where frame sequence % worker_count == worker_index, starting from the next frame written
+    or if latest is False from the oldest frame in the ring
+    """
+    def __init__(self,
+                 name: str,
+                 worker_index: int = 0,
+                 worker_count: int = 1,
+                 latest: bool = True):
+        if sys.version_info >= (3, 13):
+            self._memory = shared_memory.SharedMemory(name, track=False)
+        else:
+            self._memory = shared_memory.SharedMemory(name)
+            resource_tracker.unregister(self._memory._name, 'shared_memory')
+        (self.edge_capacity, self.frame_capacity, _,
+         frame_sequence) = _HEADER.unpack_from(self._memory.buf, 0)
+        self._frames_offset, self._edges_offset = _layout(self.frame_capacity)
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.dropped_frames = 0
+        if not latest:
+            frame_sequence = max(frame_sequence - self.frame_capacity + 1, 0)
+        self._next_frame = self._own_frame(frame_sequence)
+
+    def _own_frame(self, frame_sequence: int) -> int:
+        """The first frame at or after frame_sequence which this reader takes"""
+
+        return frame_sequence + (self.worker_index -
+                                 frame_sequence) % self.worker_count
+
+    def _sequences(self) -> tuple:
+        return _SEQUENCES.unpack_from(self._memory.buf, _SEQUENCES_OFFSET)
+
+    def read_frame(self):
+        """
+        Read the next frame without copying the edges
+
+        Returns:
+            FramePulses for the frame or None if there is no new frame
+        """
+
+        while True:
+            _, frame_sequence = self._sequences()
+
+            oldest_frame = frame_sequence - self.frame_capacity + 1
+            if self._next_frame < oldest_frame:
+                skipped_frame = self._own_frame(oldest_frame)
+                self.dropped_frames += len(
+                    range(self._next_frame, skipped_frame, self.worker_count))
+                self._next_frame = skipped_frame
+
+            if self._next_frame >= frame_sequence:
+                return None
+
+            frame = self._next_frame
+            self._next_frame += self.worker_count
+            first_edge, end_edge = _FRAME.unpack_from(
+                self._memory.buf, self._frames_offset +
+                (frame % self.frame_capacity) * _FRAME.size)
+
+            # The record or the edges may have been overwritten since the sequence was read
+            edge_sequence, frame_sequence = self._sequences()
+            if (frame_sequence - frame < self.frame_capacity
+                    and edge_sequence - first_edge < self.edge_capacity):
+                return FramePulses(self._memory.buf, self._edges_offset,
+                                   self.edge_capacity, first_edge, end_edge)
+
+            self.dropped_frames += 1
+
+    def is_valid(self, pulses: FramePulses) -> bool:
+        """
+        Check that the edges of a frame have not been overwritten since it was read.
+        Check this after decoding a frame and discard the result if it is False
+
+        Args:
+            pulses: A frame returned by read_frame
+
+        Returns:
+            True if the edges are still in the ring
+        """
+
+        edge_sequence, _ = self._sequences()
+        if edge_sequence - pulses.first_edge >= self.edge_capacity:
+            self.dropped_frames += 1
+            return False
+
+        return True
+
+    def close(self):
+        """Detach from the bus"""
+
+        self._memory.close()
+
+
+def decode_frames(reader: CaptureReader, decoder: NecDecoder) -> list:
+    """
+    Decode every frame that is waiting for a reader.
+    If a frame was overwritten while it was decoded its result is discarded and the decoder goes back to its state
+    before the frame, so a repeat message after it still returns the last valid code
+
+    Args:
+        reader: The reader to take frames from
+        decoder: The decoder to use
+
+    Returns:
+        A list of the decoded codes of valid frames
+    """
+
+    codes = []
+    pulses = reader.read_frame()
+    while pulses is not None:
+        state = (decoder.current_message_type, decoder.last_code,
+                 decoder.last_protocol)
+        code = decoder.decode(pulses)
+        if reader.is_valid(pulses):
+            codes.append(code)
+        else:
+            (decoder.current_message_type, decoder.last_code,
+             decoder.last_protocol) = state
+        pulses = reader.read_frame()
+
+    return codes
+
+
+def decode_worker(name: str,
+                  codes,
+                  stop,
+                  worker_index: int = 0,
+                  worker_count: int = 1,
+                  extended_protocol: bool = False,
+                  latest: bool = True):
+    """
+    Decode frames from a capture bus until stop is set. This is the target of a decode worker process
+
+    Args:
+        name: The name of the bus
+        codes: A multiprocessing.Queue which each decoded code is put on
+        stop: A multiprocessing.Event which is set to stop the worker once it has decoded the waiting frames
+        worker_index: The index of this worker
+        worker_count: The number of workers sharing the frames
+        extended_protocol: Passed to NecDecoder
+        latest: Whether to start from the next frame written or the oldest frame in the ring
+    """
+
+    reader = CaptureReader(name, worker_index, worker_count, latest)
+    decoder = NecDecoder(extended_protocol)
+
+    while True:
+        stopping = stop.is_set()
+        for code in decode_frames(reader, decoder):
+            codes.put(code)
+        if stopping:
+            break
+        time.sleep(POLL_INTERVAL)
+
+    reader.close()
+
+
+class SimulatedEdgeSource:
+    """
+    Stand in for a GPIO pin when testing the capture bus without a receiver.
+    Frames of pulse times are turned into pigpio style events with optional timing jitter
+    """
+    def __init__(self,
+                 frames: list,
+                 start_tick: int = 0,
+                 frame_gap: int = 40000,
+                 jitter: float = 0,
+                 seed: int = 0):
+        self.frames = frames
+        self.start_tick = start_tick
+        self.frame_gap = frame_gap
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def events(self):
+        """
+        Generate the events
+
+        Yields:
+            Tuples of level and tick, with a level of TIMEOUT after each frame
+        """
+
+        tick = self.start_tick
+        for pulses in self.frames:
+            level = 0
+            yield level, tick & TICK_MASK
+            for pulse in pulses:
+                tick += round(
+                    pulse *
+                    (1 + self._random.uniform(-self.jitter, self.jitter)))
+                level = 1 - level
+                yield level, tick & TICK_MASK
+            tick += self.frame_gap
+            yield TIMEOUT, tick & TICK_MASK
+
+    def run(self, writer: CaptureWriter):
+        """
+        Write every event to a capture bus
+
+        Args:
+            writer: The bus to write to
+        """
+
+        for level, tick in self.events():
+            writer.capture(None, level, tick)
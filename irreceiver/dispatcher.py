@@ -0,0 +1,206 @@
+"""
+This is a class to run application code for decoded NEC codes without blocking the decoder.
+
+Handlers are looked up in a dictionary keyed by the decoded 16-bit (or 24-bit extended) code and are run by a
+small pool of worker threads, so the thread that collects and decodes pulses only ever enqueues a code.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable
+
+DROP_NEWEST = 0
+DROP_OLDEST = 1
+COALESCE = 2
+QUEUE_SIZE = 16
+WORKER_COUNT = 1
+
+_STOP = object()
+
+
+class HandlerStats:
+    """
+    Timing statistics for a single handler.
+    All times are in seconds
+    """
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        """The mean time taken by one call of the handler"""
+
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def _record(self, elapsed: float, failed: bool):
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if failed:
+            self.errors += 1
+
+
+class Dispatcher:
+    """
+    Dispatch decoded codes to handlers on worker threads.
+
+    dispatch never blocks: when the queue is full the code is handled according to the policy which is one of
+    - DROP_NEWEST: The new code is discarded
+    - DROP_OLDEST: The oldest queued code is discarded to make room for the new one
+    - COALESCE: A code that is already waiting in the queue is not queued again, otherwise behave like DROP_NEWEST
+    """
+    def __init__(self,
+                 queue_size: int = QUEUE_SIZE,
+                 workers: int = WORKER_COUNT,
+                 policy: int = DROP_NEWEST,
+                 default_handler: Callable = None):
+        if policy not in (DROP_NEWEST, DROP_OLDEST, COALESCE):
+            raise ValueError('Unknown queue policy: {}'.format(policy))
+
+        self.policy = policy
+        self.default_handler = default_handler
+        self.handlers = {}
+        self.stats = {}
+        if default_handler is not None:
+            self.stats[default_handler] = HandlerStats()
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._queue = queue.Queue(queue_size)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def register(self,
+                 address: int,
+                 command: int,
+                 handler: Callable,
+                 extended_protocol: bool = False):
+        """
+        Register a handler for an address and command.
+        The handler is called with the decoded code as its only argument
+
+        Args:
+            address: The 8-bit address (16-bit if extended_protocol)
+            command: The 8-bit command
+            handler: The function to call when the code is dispatched
+            extended_protocol: Whether the address is a 16-bit extended NEC address
+        """
+
+        address_limit = 0xFFFF if extended_protocol else 0xFF
+        if not 0 <= address <= address_limit or not 0 <= command <= 0xFF:
+            raise ValueError('Address or command out of range')
+
+        self.register_code(address << 8 | command, handler)
+
+    def register_code(self, code: int, handler: Callable):
+        """
+        Register a handler for an already combined code such as one returned by NecDecoder.decode
+
+        Args:
+            code: The code to handle
+            handler: The function to call when the code is dispatched
+        """
+
+        self.handlers[code] = handler
+        self.stats.setdefault(handler, HandlerStats())
+
+    def dispatch(self, code: int) -> bool:
+        """
+        Queue the handler for a code. This is safe to call from the thread which decodes pulses.
+
+        Args:
+            code: A code returned by NecDecoder.decode
+
+        Returns:
+            True if the handler was queued and False if there is no handler, the code was dropped or coalesced or the
+            dispatcher is closed
+        """
+
+        # A repeat message received before any new message decodes to None
+        if code is None:
+            return False
+
+        handler = self.handlers.get(code, self.default_handler)
+        if handler is None:
+            return False
+
+        with self._lock:
+            if self._closed:
+                return False
+
+            if self.policy == COALESCE and code in self._pending:
+                self.coalesced += 1
+                return False
+
+            try:
+                self._queue.put_nowait((code, handler))
+            except queue.Full:
+                if self.policy != DROP_OLDEST:
+                    self.dropped += 1
+                    return False
+
+                try:
+                    oldest = self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                else:
+                    # A worker must never lose its stop signal so it goes back and the new code is dropped instead
+                    if oldest is _STOP:
+                        self._queue.put_nowait(_STOP)
+                        self.dropped += 1
+                        return False
+
+                    self._pending.discard(oldest[0])
+                    self.dropped += 1
+                self._queue.put_nowait((code, handler))
+
+            self._pending.add(code)
+
+        return True
+
+    def close(self):
+        """Stop the worker threads once the handlers that are already queued have run"""
+
+        # Once this is set dispatch no longer touches the queue so the stop signals can not be evicted
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            code, handler = item
+            with self._lock:
+                self._pending.discard(code)
+
+            failed = False
+            start = time.perf_counter()
+            try:
+                handler(code)
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.stats[handler]._record(elapsed, failed)
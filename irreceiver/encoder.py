@@ -0,0 +1,171 @@
+"""
+This is a class to create NEC IR remote protocol messages, the inverse of NecDecoder.
+
+A message is a compact array of alternating mark and space times starting with the AGC burst.
+Messages are cached so sending the same code again does not build it again. The cached arrays are shared and must not
+be changed.
+"""
+
+import abc
+from array import array
+from functools import lru_cache
+
+from irreceiver.irreceiver import NecDecoder
+
+ENCODER_CACHE_SIZE = 32
+
+
+class WaveformSink(abc.ABC):
+    """
+    Somewhere to send encoded messages, such as a pigpio wave or a file.
+    Subclasses must implement send
+    """
+    @abc.abstractmethod
+    def send(self, durations: array):
+        """
+        Output a message
+
+        Args:
+            durations: An array of alternating mark and space times starting with a mark
+        """
+
+
+class FileSink(WaveformSink):
+    """
+    Write each message to a text file as a line of comma separated times
+    """
+    def __init__(self, file):
+        self.file = file
+
+    def send(self, durations: array):
+        self.file.write(','.join('{:g}'.format(duration)
+                                 for duration in durations) + '\n')
+
+
+class NecEncoder:
+    """
+    Encode an NEC protocol message.
+    The timing is taken from decoder so an encoded message is always decoded by it.
+    typecode is the array type of the encoded messages, times are rounded for integer types
+    """
+    def __init__(self,
+                 decoder: NecDecoder = None,
+                 cache_size: int = ENCODER_CACHE_SIZE,
+                 typecode: str = 'd'):
+        decoder = decoder if decoder is not None else NecDecoder()
+        self.typecode = typecode
+        self.leading_time = self._time(decoder.leading_time)
+        self.new_pause_time = self._time(decoder.new_pause_time)
+        self.repeat_pause_time = self._time(decoder.repeat_pause_time)
+        self.low_time = self._time(decoder.low_time)
+        self.high_time = self._time(decoder.high_time)
+        self.repeat_message = array(
+            typecode,
+            [self.leading_time, self.repeat_pause_time, self.low_time])
+        self._encode = lru_cache(maxsize=cache_size)(self._create_message)
+
+    def _time(self, duration: float) -> float:
+        return duration if self.typecode in 'fd' else round(duration)
+
+    def _create_message(self, address: int, command: int,
+                        extended_protocol: bool) -> array:
+        """
+        Create the array of times for a message.
+        Each byte is sent LSB first and every bit is a low mark followed by a low space for a zero or a high space for
+        a one
+
+        Args:
+            address: The 8-bit address (16-bit if extended_protocol)
+            command: The 8-bit command
+            extended_protocol: Whether the address is a 16-bit extended NEC address
+
+        Returns:
+            An array of alternating mark and space times starting with the AGC burst
+        """
+
+        address_limit = 0xFFFF if extended_protocol else 0xFF
+        if not 0 <= address <= address_limit or not 0 <= command <= 0xFF:
+            raise ValueError('Address or command out of range')
+
+        if extended_protocol:
+            message_bytes = (address & 0xFF, address >> 8)
+        else:
+            message_bytes = (address, ~address & 0xFF)
+        message_bytes += (command, ~command & 0xFF)
+
+        durations = array(self.typecode,
+                          [self.leading_time, self.new_pause_time])
+        for message_byte in message_bytes:
+            for bit_index in range(8):
+                durations.append(self.low_time)
+                durations.append(self.high_time if message_byte >> bit_index
+                                 & 1 else self.low_time)
+
+        # Final burst
+        durations.append(self.low_time)
+
+        return durations
+
+    def encode(self,
+               address: int,
+               command: int,
+               extended_protocol: bool = False) -> array:
+        """
+        Encode a new message
+
+        Args:
+            address: The 8-bit address (16-bit if extended_protocol)
+            command: The 8-bit command
+            extended_protocol: Whether the address is a 16-bit extended NEC address
+
+        Returns:
+            An array of alternating mark and space times, this is shared with the cache and must not be changed
+        """
+
+        return self._encode(address, command, extended_protocol)
+
+    def encode_code(self, code: int, extended_protocol: bool = False) -> array:
+        """
+        Encode a code such as one returned by NecDecoder.decode
+
+        Args:
+            code: The address followed by the 8-bit command
+            extended_protocol: Whether the address is a 16-bit extended NEC address
+
+        Returns:
+            An array of alternating mark and space times as returned by encode
+        """
+
+        return self._encode(code >> 8, code & 0xFF, extended_protocol)
+
+    def cache_info(self):
+        """The hits, misses and size of the message cache as returned by functools.lru_cache"""
+
+        return self._encode.cache_info()
+
+    def send(self,
+             sink: WaveformSink,
+             address: int,
+             command: int,
+             extended_protocol: bool = False):
+        """
+        Encode a new message and send it to sink
+
+        Args:
+            sink: Where to send the message
+            address: The 8-bit address (16-bit if extended_protocol)
+            command: The 8-bit command
+            extended_protocol: Whether the address is a 16-bit extended NEC address
+        """
+
+        sink.send(self._encode(address, command, extended_protocol))
+
+    def send_repeat(self, sink: WaveformSink):
+        """
+        Send a repeat message to sink
+
+        Args:
+            sink: Where to send the message
+        """
+
+        sink.send(self.repeat_message)
@@ -0,0 +1,130 @@
+"""
+Preprocessing for noisy pulse trains.
+
+Receivers sometimes report a short spurious spike in the middle of a mark or a space. The spike splits one pulse into
+three which shifts the index of every pulse after it, so a glitch is merged back into the pulse before it together with
+the pulse after it. This keeps the pulses alternating between marks and spaces.
+Glitches before the first real pulse are dropped.
+
+filter_glitches works on a whole list of pulses, GlitchFilter works one pulse at a time. Both give the same result.
+NumPy is only faster for long lists so filter_glitches uses it, if it is installed, from NUMPY_MIN_PULSES pulses.
+Integer pulse times stay integers and float pulse times stay floats.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Half of the NEC low time is well outside of the timing tolerance of any valid pulse
+MIN_PULSE_WIDTH = 562.5 / 2
+
+# Below this NumPy's per call overhead is larger than the pure Python loop, a frame has fewer than 100 pulses
+NUMPY_MIN_PULSES = 300
+
+
+class GlitchFilter:
+    """
+    Remove glitches from a stream of pulse times.
+    A pulse is only output once the pulse after it is known not to be a glitch
+    """
+    def __init__(self, min_width: float = MIN_PULSE_WIDTH):
+        self.min_width = min_width
+        self._pending = None
+        self._merge_next = False
+
+    def push(self, pulse: float) -> list:
+        """
+        Add a pulse to the filter
+
+        Args:
+            pulse: The time of the pulse
+
+        Returns:
+            A list of the pulses that are now complete, this is empty or has one element
+        """
+
+        if self._merge_next:
+            self._pending += pulse
+            self._merge_next = False
+        elif pulse < self.min_width:
+            if self._pending is not None:
+                self._pending += pulse
+                self._merge_next = True
+        else:
+            completed = [] if self._pending is None else [self._pending]
+            self._pending = pulse
+            return completed
+
+        return []
+
+    def flush(self) -> list:
+        """
+        Output the last pulse and reset the filter for the next frame
+
+        Returns:
+            A list of the remaining pulses
+        """
+
+        completed = [] if self._pending is None else [self._pending]
+        self._pending = None
+        self._merge_next = False
+        return completed
+
+
+def _filter_glitches_python(pulses: list, min_width: float) -> list:
+    glitch_filter = GlitchFilter(min_width)
+    filtered = []
+    for pulse in pulses:
+        filtered.extend(glitch_filter.push(pulse))
+    filtered.extend(glitch_filter.flush())
+    return filtered
+
+
+def _filter_glitches_numpy(pulses: list, min_width: float) -> list:
+    times = numpy.asarray(pulses)
+    integer_times = times.dtype.kind in 'iu'
+    times = times.astype(float)
+    glitches = times < min_width
+    if not glitches.any():
+        return list(pulses)
+
+    # Leading glitches have nothing to merge into so they are dropped
+    first = int(numpy.argmin(glitches)) if not glitches.all() else len(times)
+    times = times[first:]
+    glitches = glitches[first:]
+
+    # In a run of consecutive glitches the first merges with the pulse after it, the next unmerged one is two later
+    indices = numpy.arange(len(times))
+    run_starts = numpy.zeros(len(times), dtype=bool)
+    run_starts[1:] = glitches[1:] & ~glitches[:-1]
+    run_start_index = numpy.maximum.accumulate(
+        numpy.where(run_starts, indices, 0))
+    merging = glitches & ((indices - run_start_index) % 2 == 0)
+
+    # A pulse starts a new output pulse unless it is a merging glitch or the pulse after one
+    new_pulse = ~merging
+    new_pulse[1:] &= ~merging[:-1]
+    groups = numpy.cumsum(new_pulse) - 1
+    filtered = numpy.bincount(groups, weights=times)
+    if integer_times:
+        filtered = filtered.astype(numpy.int64)
+    return filtered.tolist()
+
+
+def filter_glitches(pulses: list, min_width: float = MIN_PULSE_WIDTH) -> list:
+    """
+    Remove glitches from a list of pulse times in a single pass
+
+    Args:
+        pulses: A list where each element is the time between pulses
+        min_width: Any pulse shorter than this is a glitch
+
+    Returns:
+        A new list of pulse times without glitches
+    """
+
+    if numpy is not None and len(pulses) >= NUMPY_MIN_PULSES:
+        return _filter_glitches_numpy(pulses, min_width)
+
+    return _filter_glitches_python(pulses, min_width)
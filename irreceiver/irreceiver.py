@@ -4,11 +4,15 @@ This is a class to parse the NEC IR remote protocol.
 A reference for the protocol can be found at https://www.sbprojects.net/knowledge/ir/nec.php
 """
 
+from typing import Callable, Optional
+
 INVALID_FRAME = -1
 REPEAT_MESSAGE = 0
 NEW_MESSAGE = 1
 FRAME_TIME_MS = 67.5
 TIMING_TOLERANCE = .3125
+NEC_STANDARD = 0
+NEC_EXTENDED = 1
 
 
 class NecDecoder:
@@ -16,22 +20,43 @@ class NecDecoder:
     Decode an NEC protocol message.
     A single integer is returned where the first eight bits are the address and the second eight are the command.
     Most member variables come from the spec except timing_tolerance which was found empirically
+    pulse_filter is an optional function such as filters.filter_glitches which is applied to the pulses before decoding
+
+    If extended_protocol is None the protocol is detected for each frame: a frame where the address bytes are not
+    complements can only be extended, otherwise it is standard unless preferred_protocols maps its 16-bit extended
+    address to NEC_EXTENDED. preferred_protocols is only used when the protocol is detected.
+    Only protocols in accepted_protocols are decoded, whether the protocol is detected or fixed.
+
+    monitor is an optional monitor.LinkMonitor which is given the timing of every frame, receiver identifies this
+    decoder in the monitor.
     """
     def __init__(self,
-                 extended_protocol: bool = False,
-                 time_tolerance: float = TIMING_TOLERANCE):
+                 extended_protocol: Optional[bool] = False,
+                 time_tolerance: float = TIMING_TOLERANCE,
+                 pulse_filter: Callable = None,
+                 accepted_protocols: tuple = (NEC_STANDARD, NEC_EXTENDED),
+                 preferred_protocols: dict = None,
+                 monitor=None,
+                 receiver=None):
         self.leading_time = 9000
         self.new_pause_time = 4500
         self.repeat_pause_time = 2250
         self.low_time = 562.5
+        self.high_time = 1687.5
         self.new_frame_pulses = 67
         self.repeat_frame_pulses = 3
         self.first_data_bit_index = 2
         self.new_message_bits = self.new_frame_pulses - self.first_data_bit_index
         self.timing_tolerance = time_tolerance
         self.extended_protocol = extended_protocol
+        self.pulse_filter = pulse_filter
+        self.accepted_protocols = accepted_protocols
+        self.preferred_protocols = preferred_protocols or {}
+        self.monitor = monitor
+        self.receiver = receiver
         self.current_message_type = None
         self.last_code = None
+        self.last_protocol = None
 
     def _find_start_index(self, pulses: list) -> int:
         """
@@ -137,42 +162,90 @@ class NecDecoder:
             self.low_time else 1 for pulse in data_bits
         ]
 
-    def _validate_message(self, message_bits: list) -> bool:
+    def _validate_command(self, message_bits: list) -> bool:
         """
-        The NEC spec says the first 8 and second 8 bits of the message should be complements as should the third and
-        four 8 bits of the message.
-
-        This is only for non-extended NEC messages.
+        The NEC spec says the third and fourth 8 bits of the message should be complements.
+        This is true for both the standard and extended protocol.
 
         Args:
             message_bits: A valid string of bits
 
         Returns:
-            True if the message is valid, False if not
+            True if the command is valid, False if not
         """
 
         command = message_bits[16:24]
         command_inverse = message_bits[24:32]
 
         # Check each bit in the command and return False if any two are not inverses
-        if not all(False for bit, bit_inverse in zip(command, command_inverse)
-                   if bit == bit_inverse):
-            return False
+        return all(False for bit, bit_inverse in zip(command, command_inverse)
+                   if bit == bit_inverse)
+
+    def _select_protocol(self, message_bits: list) -> int:
+        """
+        Find which protocol a message uses.
+        In the standard protocol the first 8 and second 8 bits of the message are complements, in the extended protocol
+        they are a single 16 bit address.
+
+        Args:
+            message_bits: A valid string of bits
+
+        Returns:
+            NEC_STANDARD or NEC_EXTENDED, or INVALID_FRAME if the message does not match an allowed protocol
+        """
+
+        if self.extended_protocol:
+            return NEC_EXTENDED if NEC_EXTENDED in self.accepted_protocols else INVALID_FRAME
+
+        address = message_bits[:8]
+        address_inverse = message_bits[8:16]
+        address_inverted = all(
+            False for bit, bit_inverse in zip(address, address_inverse)
+            if bit == bit_inverse)
+
+        # The protocol is fixed
+        if self.extended_protocol is not None:
+            if address_inverted and NEC_STANDARD in self.accepted_protocols:
+                return NEC_STANDARD
+            return INVALID_FRAME
+
+        if address_inverted:
+            extended_address = 0
+            for bit in reversed(message_bits[:16]):
+                extended_address = (extended_address << 1) | bit
+
+            preferred = self.preferred_protocols.get(extended_address,
+                                                     NEC_STANDARD)
+            if preferred in self.accepted_protocols:
+                return preferred
+            if NEC_STANDARD in self.accepted_protocols:
+                return NEC_STANDARD
+
+        if NEC_EXTENDED in self.accepted_protocols:
+            return NEC_EXTENDED
+
+        return INVALID_FRAME
+
+    def _validate_message(self, message_bits: list) -> bool:
+        """
+        The NEC spec says the first 8 and second 8 bits of the message should be complements as should the third and
+        four 8 bits of the message.
 
-        # Address inverse is only checked for the non-extended protocol
-        if not self.extended_protocol:
-            address = message_bits[:8]
-            address_inverse = message_bits[8:16]
+        The address is only checked for non-extended NEC messages.
 
-            # Check each bit in the address and return False if any two are not inverses
-            if not all(False
-                       for bit, bit_inverse in zip(address, address_inverse)
-                       if bit == bit_inverse):
-                return False
+        Args:
+            message_bits: A valid string of bits
+
+        Returns:
+            True if the message is valid, False if not
+        """
 
-        return True
+        return self._validate_command(message_bits) and self._select_protocol(
+            message_bits) != INVALID_FRAME
 
-    def _create_number_from_bits(self, data_bits: list) -> int:
+    def _create_number_from_bits(self,
+                                 data_bits: list,
+                                 protocol: int = None) -> int:
         """
         Create an integer from the list of bits.
         The address is contained in the first 8 or 16 bits (depending on extended protocol)
@@ -181,13 +254,17 @@ class NecDecoder:
 
         Args:
             data_bits: A list of zeros and ones indicating the number
+            protocol: NEC_STANDARD or NEC_EXTENDED, if this is None it is set by extended_protocol
 
         Returns:
             code: A hex number where the first part is the address and the second is the command
         """
 
+        if protocol is None:
+            protocol = NEC_EXTENDED if self.extended_protocol else NEC_STANDARD
+
         command_length = 8
-        address_length = 8 if not self.extended_protocol else 16
+        address_length = 8 if protocol == NEC_STANDARD else 16
 
         address = 0
         for bit in reversed(data_bits[:address_length:]):
@@ -214,20 +291,60 @@ class NecDecoder:
             An integer where the first eight bits are the address and the
         """
 
+        return self.decode_frame(pulse_times)[0]
+
+    def decode_frame(self, pulse_times: list) -> tuple:
+        """
+        Decode a list of pulse times and find which protocol the frame uses.
+        Repeat messages have the protocol of the message they repeat.
+
+        Args:
+            pulse_times: A list of valid pulse times
+
+        Returns:
+            A tuple of the code as returned by decode and NEC_STANDARD, NEC_EXTENDED or INVALID_FRAME
+        """
+
+        if self.pulse_filter is not None:
+            pulse_times = self.pulse_filter(pulse_times)
+
         start_index = self._find_start_index(pulse_times)
+        code, protocol = self._decode_from_start(pulse_times, start_index)
+
+        if self.monitor is not None:
+            self.monitor.observe(self, pulse_times, start_index, code)
+
+        return code, protocol
+
+    def _decode_from_start(self, pulse_times: list, start_index: int) -> tuple:
+        """
+        Decode a list of pulse times once the start of the frame has been found
+
+        Args:
+            pulse_times: A list of valid pulse times
+            start_index: The index of the start pulse or INVALID_FRAME
+
+        Returns:
+            A tuple of the code and protocol as returned by decode_frame
+        """
+
         if start_index != INVALID_FRAME:
             self._classify_message(pulse_times, start_index)
 
             if self.current_message_type == NEW_MESSAGE:
                 if self._validate_pulses(pulse_times, start_index):
                     bits = self._convert_pulses(pulse_times, start_index)
-                    if self._validate_message(bits):
-                        code = self._create_number_from_bits(bits)
-                        self.last_code = code
-                        return code
+                    if self._validate_command(bits):
+                        protocol = self._select_protocol(bits)
+                        if protocol != INVALID_FRAME:
+                            code = self._create_number_from_bits(
+                                bits, protocol)
+                            self.last_code = code
+                            self.last_protocol = protocol
+                            return code, protocol
 
             # Repeat messages are not validated
             else:
-                return self.last_code
+                return self.last_code, self.last_protocol
 
-        return INVALID_FRAME
+        return INVALID_FRAME, INVALID_FRAME
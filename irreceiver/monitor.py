@@ -0,0 +1,261 @@
+"""
+This is a class to keep running statistics about the quality of received IR frames.
+
+Every statistic is updated in constant time and memory as each frame is decoded: means and variances use Welford's
+algorithm and recent values use an exponentially weighted moving average (EWMA).
+
+The margin of a pulse is how far it is from the edge of the timing tolerance, 1 is a pulse with exactly the time from
+the spec and 0 is a pulse that is just at the timing tolerance. A margin that drifts towards 0 points to a failing
+receiver or a weak battery in a remote.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from irreceiver.irreceiver import INVALID_FRAME, NEW_MESSAGE, REPEAT_MESSAGE
+
+EWMA_WEIGHT = .1
+MAX_ADDRESSES = 256
+
+
+class RunningStats:
+    """
+    The mean and variance of a series of values using Welford's algorithm
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._sum_squares = 0.0
+
+    @property
+    def variance(self) -> float:
+        """The sample variance of the values"""
+
+        return self._sum_squares / (self.count - 1) if self.count > 1 else 0.0
+
+    def add(self, value: float):
+        """
+        Add a value to the statistics
+
+        Args:
+            value: The value to add
+        """
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._sum_squares += delta * (value - self.mean)
+
+
+class LinkStats:
+    """
+    The statistics for one receiver or one address.
+    Times are in the same unit as the pulse times and gaps are in the unit of the monitor clock
+    """
+    def __init__(self, ewma_weight: float = EWMA_WEIGHT):
+        self.ewma_weight = ewma_weight
+        self.frames = 0
+        self.accepted = 0
+        self.recent_accept_ratio = None
+        self.marks = RunningStats()
+        self.zero_spaces = RunningStats()
+        self.one_spaces = RunningStats()
+        self.gaps = RunningStats()
+        self.worst_margin = None
+        self.recent_margin = None
+        self.last_time = None
+
+    def _ewma(self, average: float, value: float) -> float:
+        if average is None:
+            return value
+
+        return average + self.ewma_weight * (value - average)
+
+    def _record(self, timestamp: float, accepted: bool, timing: tuple):
+        self.frames += 1
+        self.recent_accept_ratio = self._ewma(self.recent_accept_ratio,
+                                              1.0 if accepted else 0.0)
+        if self.last_time is not None:
+            self.gaps.add(timestamp - self.last_time)
+        self.last_time = timestamp
+
+        if accepted:
+            self.accepted += 1
+            marks, zero_spaces, one_spaces, margin = timing
+            for mark in marks:
+                self.marks.add(mark)
+            for space in zero_spaces:
+                self.zero_spaces.add(space)
+            for space in one_spaces:
+                self.one_spaces.add(space)
+
+            if self.worst_margin is None or margin < self.worst_margin:
+                self.worst_margin = margin
+            self.recent_margin = self._ewma(self.recent_margin, margin)
+
+    def snapshot(self) -> dict:
+        """
+        Copy the current statistics
+
+        Returns:
+            A dictionary of the statistics
+        """
+
+        return {
+            'frames': self.frames,
+            'accepted': self.accepted,
+            'accept_ratio':
+            self.accepted / self.frames if self.frames else None,
+            'recent_accept_ratio': self.recent_accept_ratio,
+            'mark_mean': self.marks.mean,
+            'mark_variance': self.marks.variance,
+            'zero_space_mean': self.zero_spaces.mean,
+            'zero_space_variance': self.zero_spaces.variance,
+            'one_space_mean': self.one_spaces.mean,
+            'one_space_variance': self.one_spaces.variance,
+            'gap_mean': self.gaps.mean,
+            'gap_variance': self.gaps.variance,
+            'worst_margin': self.worst_margin,
+            'recent_margin': self.recent_margin,
+        }
+
+
+class LinkMonitor:
+    """
+    Keep LinkStats for each receiver and each address.
+    A receiver is identified by the receiver member of the decoder and an address by a tuple of the protocol of the
+    decoder (NEC_STANDARD or NEC_EXTENDED) and the code shifted right 8 bits, so a standard and an extended address
+    with the same value are kept apart.
+    Once max_addresses addresses are being tracked new addresses are only counted in the receiver statistics
+    """
+    def __init__(self,
+                 ewma_weight: float = EWMA_WEIGHT,
+                 max_addresses: int = MAX_ADDRESSES,
+                 clock: Callable = time.monotonic):
+        self.ewma_weight = ewma_weight
+        self.max_addresses = max_addresses
+        self.clock = clock
+        self.receivers = {}
+        self.addresses = {}
+        self._lock = threading.Lock()
+
+    def _frame_timing(self, decoder, pulses: list, start_index: int) -> tuple:
+        """
+        Sort the pulses of an accepted frame and find the smallest margin
+
+        Args:
+            decoder: The NecDecoder that decoded the frame
+            pulses: A list where each element is the time between pulses
+            start_index: The index of the start pulse
+
+        Returns:
+            A tuple of the data marks, zero spaces, one spaces and the smallest margin
+        """
+
+        tolerance = decoder.timing_tolerance
+        low_time = decoder.low_time
+
+        if decoder.current_message_type == NEW_MESSAGE:
+            pause_time = decoder.new_pause_time
+            end_index = start_index + decoder.new_frame_pulses - 1
+        else:
+            pause_time = decoder.repeat_pause_time
+            end_index = start_index + decoder.repeat_frame_pulses - 1
+
+        margin = min(
+            1 - abs(pulses[start_index] - decoder.leading_time) /
+            (decoder.leading_time * tolerance),
+            1 - abs(pulses[start_index + 1] - pause_time) /
+            (pause_time * tolerance))
+        if end_index < len(pulses):
+            margin = min(
+                margin,
+                1 - abs(pulses[end_index] - low_time) / (low_time * tolerance))
+
+        marks = pulses[start_index + decoder.first_data_bit_index:end_index:2]
+        spaces = pulses[start_index + decoder.first_data_bit_index +
+                        1:end_index:2]
+        zero_spaces = []
+        one_spaces = []
+        for space in spaces:
+            if abs(low_time - space) < tolerance * low_time:
+                zero_spaces.append(space)
+            else:
+                one_spaces.append(space)
+
+        nominal_times = [(marks, low_time), (zero_spaces, low_time),
+                         (one_spaces, decoder.high_time)]
+        for pulse_times, nominal in nominal_times:
+            for pulse in pulse_times:
+                margin = min(margin,
+                             1 - abs(pulse - nominal) / (nominal * tolerance))
+
+        return marks, zero_spaces, one_spaces, margin
+
+    def _stats(self, table: dict, key) -> LinkStats:
+        stats = table.get(key)
+        if stats is None:
+            stats = LinkStats(self.ewma_weight)
+            table[key] = stats
+
+        return stats
+
+    def observe(self,
+                decoder,
+                pulses: list,
+                start_index: int,
+                code: int,
+                timestamp: float = None):
+        """
+        Update the statistics with a frame. This is called by NecDecoder.decode_frame
+
+        Args:
+            decoder: The NecDecoder that decoded the frame
+            pulses: A list where each element is the time between pulses
+            start_index: The index of the start pulse or INVALID_FRAME
+            code: The code returned by the decoder
+            timestamp: The time the frame was received, by default the current time of the clock
+        """
+
+        if timestamp is None:
+            timestamp = self.clock()
+
+        decoded = code is not None and code != INVALID_FRAME
+        accepted = (start_index != INVALID_FRAME and decoded
+                    and decoder.current_message_type
+                    in (NEW_MESSAGE, REPEAT_MESSAGE))
+        timing = self._frame_timing(decoder, pulses,
+                                    start_index) if accepted else None
+
+        with self._lock:
+            self._stats(self.receivers,
+                        decoder.receiver)._record(timestamp, accepted, timing)
+
+            if accepted:
+                address = decoder.last_protocol, code >> 8
+                if (address in self.addresses
+                        or len(self.addresses) < self.max_addresses):
+                    self._stats(self.addresses,
+                                address)._record(timestamp, accepted, timing)
+
+    def snapshot(self) -> dict:
+        """
+        Copy the current statistics. This is safe to call from a different thread than the decoder
+
+        Returns:
+            A dictionary with the statistics of each receiver under 'receivers' and of each protocol and address tuple
+            under 'addresses'
+        """
+
+        with self._lock:
+            return {
+                'receivers': {
+                    receiver: stats.snapshot()
+                    for receiver, stats in self.receivers.items()
+                },
+                'addresses': {
+                    address: stats.snapshot()
+                    for address, stats in self.addresses.items()
+                },
+            }
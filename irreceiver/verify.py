@@ -0,0 +1,359 @@
+"""
+This is a harness to check that decoder engines give exactly the same results as NecDecoder.decode.
+
+An engine is a function that returns a new decoder, anything with decode, current_message_type and last_code like
+NecDecoder, and the protocol is compared too if the decoder has last_protocol. Every engine decodes the same corpus of
+frames in order so repeat messages are checked against the frames before them. Each frame where an engine differs from
+the reference is shrunk to a minimal list of pulses that still differs, and the time taken by every engine is measured
+in the same run.
+
+Corpora can be generated with generate_corpus or recorded with encoder.FileSink and read with load_corpus.
+The glitch filters only change frames with glitches, so glitch_engines are also compared with each other on a corpus
+generated with glitch_ratio. The protocol detecting decoder (NecDecoder(None)) is not one of the default engines
+because it decodes frames that a fixed protocol decoder rejects, compare it with NecDecoder(True) on an extended corpus.
+Run this module to check the default and glitch engines: python -m irreceiver.verify [CORPUS_FILE ...]
+"""
+
+import argparse
+import random
+import time
+from functools import partial
+from typing import Callable
+
+from irreceiver import filters
+from irreceiver.encoder import NecEncoder
+from irreceiver.irreceiver import NecDecoder, TIMING_TOLERANCE
+from irreceiver.monitor import LinkMonitor
+
+CORPUS_SIZE = 1000
+JITTER = TIMING_TOLERANCE / 2
+REPEAT_RATIO = .3
+CORRUPT_RATIO = .2
+GLITCH_RATIO = .5
+
+
+def glitch_engines() -> dict:
+    """
+    The batch and stream glitch filters, which should decode frames with glitches exactly like each other
+
+    Returns:
+        A dictionary of engine names and functions which return a new decoder
+    """
+
+    # The batch glitch filter uses NumPy for long lists if it is installed, the stream filter is always pure Python
+    stream_glitch_filter = partial(filters._filter_glitches_python,
+                                   min_width=filters.MIN_PULSE_WIDTH)
+
+    return {
+        'glitch_filter':
+        lambda: NecDecoder(pulse_filter=filters.filter_glitches),
+        'stream_glitch_filter':
+        lambda: NecDecoder(pulse_filter=stream_glitch_filter),
+    }
+
+
+def default_engines() -> dict:
+    """
+    The engines in this package which should decode frames without glitches exactly like the reference
+
+    Returns:
+        A dictionary of engine names and functions which return a new decoder
+    """
+
+    engines = {'reference': NecDecoder}
+    engines.update(glitch_engines())
+    engines['monitor'] = lambda: NecDecoder(monitor=LinkMonitor())
+
+    return engines
+
+
+def generate_corpus(size: int = CORPUS_SIZE,
+                    seed: int = 0,
+                    jitter: float = JITTER,
+                    repeat_ratio: float = REPEAT_RATIO,
+                    corrupt_ratio: float = CORRUPT_RATIO,
+                    extended_protocol: bool = False,
+                    glitch_ratio: float = 0) -> list:
+    """
+    Generate a corpus of random messages, repeat messages and corrupted frames
+
+    Args:
+        size: The number of frames
+        seed: The seed for the random number generator so the corpus can be generated again
+        jitter: The largest change to each pulse as a fraction of its time
+        repeat_ratio: The fraction of frames that are repeat messages
+        corrupt_ratio: The fraction of frames that are changed so they might not be valid
+        extended_protocol: Whether new messages use a 16-bit extended address
+        glitch_ratio: The fraction of frames where a pulse is split by a glitch shorter than filters.MIN_PULSE_WIDTH
+
+    Returns:
+        A list of frames where each frame is a list of pulse times
+    """
+
+    generator = random.Random(seed)
+    encoder = NecEncoder()
+    address_limit = 0xFFFF if extended_protocol else 0xFF
+
+    corpus = []
+    for _ in range(size):
+        if generator.random() < repeat_ratio:
+            pulses = list(encoder.repeat_message)
+        else:
+            pulses = list(
+                encoder.encode(generator.randint(0, address_limit),
+                               generator.randint(0, 0xFF), extended_protocol))
+
+        pulses = [
+            pulse * (1 + generator.uniform(-jitter, jitter))
+            for pulse in pulses
+        ]
+
+        if generator.random() < corrupt_ratio:
+            index = generator.randrange(len(pulses))
+            corruption = generator.randrange(3)
+            if corruption == 0:
+                pulses = pulses[:index]
+            elif corruption == 1:
+                del pulses[index]
+            else:
+                pulses[index] *= generator.choice((.75, 2, 3))
+
+        if glitch_ratio and pulses and generator.random() < glitch_ratio:
+            index = generator.randrange(len(pulses))
+            glitch = filters.MIN_PULSE_WIDTH * generator.uniform(.1, .9)
+            before = max(pulses[index] - glitch, 0) * generator.uniform(
+                .25, .75)
+            after = max(pulses[index] - glitch - before, 0)
+            pulses[index:index + 1] = [before, glitch, after]
+
+        corpus.append(pulses)
+
+    return corpus
+
+
+def load_corpus(file) -> list:
+    """
+    Read a corpus written by encoder.FileSink
+
+    Args:
+        file: A text file with one frame per line of comma separated pulse times
+
+    Returns:
+        A list of frames where each frame is a list of pulse times
+    """
+
+    return [[float(pulse) for pulse in line.split(',')] for line in file
+            if line.strip()]
+
+
+def _outcome(decoder, pulses: list) -> tuple:
+    """
+    Decode a frame and record everything that has to match the reference
+
+    Args:
+        decoder: The decoder to use
+        pulses: A list of pulse times
+
+    Returns:
+        A tuple of the code, message type, last code and last protocol, or of the exception if decoding failed
+    """
+
+    try:
+        code = decoder.decode(pulses)
+    except Exception as error:
+        return 'error', type(error).__name__
+
+    return (code, decoder.current_message_type, decoder.last_code,
+            getattr(decoder, 'last_protocol', None))
+
+
+class Mismatch:
+    """
+    A frame which an engine decoded differently than the reference
+    """
+    def __init__(self, engine: str, index: int, pulses: list,
+                 shrunk_pulses: list, expected: tuple, actual: tuple):
+        self.engine = engine
+        self.index = index
+        self.pulses = pulses
+        self.shrunk_pulses = shrunk_pulses
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self):
+        return 'Mismatch({}, frame {}: expected {} got {} for {})'.format(
+            self.engine, self.index, self.expected, self.actual,
+            self.shrunk_pulses)
+
+
+class VerificationReport:
+    """
+    The mismatches and the decode time of each engine.
+    Throughput is in frames per second
+    """
+    def __init__(self, frames: int, reference: str):
+        self.frames = frames
+        self.reference = reference
+        self.mismatches = []
+        self.times = {}
+
+    @property
+    def passed(self) -> bool:
+        """True if every engine matched the reference"""
+
+        return not self.mismatches
+
+    def throughput(self) -> dict:
+        """The frames decoded per second by each engine"""
+
+        return {
+            engine: self.frames / elapsed if elapsed else float('inf')
+            for engine, elapsed in self.times.items()
+        }
+
+    def relative_throughput(self) -> dict:
+        """The throughput of each engine divided by the throughput of the reference"""
+
+        return {
+            engine:
+            self.times[self.reference] / elapsed if elapsed else float('inf')
+            for engine, elapsed in self.times.items()
+        }
+
+
+def _shrink(pulses: list, differs: Callable) -> list:
+    """
+    Remove as many pulses as possible while the engines still differ.
+    Chunks of pulses are removed starting with half of the list and halving each time
+
+    Args:
+        pulses: A list of pulse times which differs
+        differs: A function which is True if a list of pulse times still differs
+
+    Returns:
+        The smallest list of pulse times found
+    """
+
+    pulses = list(pulses)
+    chunk = len(pulses) // 2
+    while chunk:
+        index = 0
+        while index < len(pulses):
+            candidate = pulses[:index] + pulses[index + chunk:]
+            if differs(candidate):
+                pulses = candidate
+            else:
+                index += chunk
+        chunk //= 2
+
+    return pulses
+
+
+def verify(corpus: list,
+           engines: dict = None,
+           reference: str = 'reference',
+           shrink: bool = True) -> VerificationReport:
+    """
+    Decode a corpus with every engine and compare the results to the reference engine
+
+    Args:
+        corpus: A list of frames where each frame is a list of pulse times
+        engines: A dictionary of engine names and functions which return a new decoder, by default default_engines
+        reference: The name of the engine the others are compared to
+        shrink: Whether to shrink the pulses of each mismatch
+
+    Returns:
+        A VerificationReport
+    """
+
+    engines = engines if engines is not None else default_engines()
+    report = VerificationReport(len(corpus), reference)
+
+    outcomes = {}
+    for name, engine in engines.items():
+        decoder = engine()
+        engine_outcomes = []
+        start = time.perf_counter()
+        for pulses in corpus:
+            engine_outcomes.append(_outcome(decoder, pulses))
+        report.times[name] = time.perf_counter() - start
+        outcomes[name] = engine_outcomes
+
+    expected_outcomes = outcomes[reference]
+    for name, engine_outcomes in outcomes.items():
+        if name == reference:
+            continue
+
+        for index, (expected, actual) in enumerate(
+                zip(expected_outcomes, engine_outcomes)):
+            if expected == actual:
+                continue
+
+            # Repeat messages depend on the last code and protocol so both decoders start from the state before this
+            # frame
+            previous = expected_outcomes[index - 1] if index else None
+            last_code, last_protocol = previous[2:] if previous and len(
+                previous) == 4 else (None, None)
+
+            def differs(pulses: list,
+                        engine: Callable = engines[name]) -> bool:
+                reference_decoder = engines[reference]()
+                engine_decoder = engine()
+                reference_decoder.last_code = last_code
+                engine_decoder.last_code = last_code
+                reference_decoder.last_protocol = last_protocol
+                engine_decoder.last_protocol = last_protocol
+                return _outcome(reference_decoder,
+                                pulses) != _outcome(engine_decoder, pulses)
+
+            pulses = corpus[index]
+            shrunk_pulses = _shrink(
+                pulses,
+                differs) if shrink and differs(pulses) else list(pulses)
+            report.mismatches.append(
+                Mismatch(name, index, pulses, shrunk_pulses, expected, actual))
+
+    return report
+
+
+def main():
+    """Check the default engines against generated and recorded corpora and print the results"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('corpus_files',
+                        nargs='*',
+                        help='Files of frames written by FileSink')
+    parser.add_argument('--size', type=int, default=CORPUS_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    recorded_corpus = []
+    for path in args.corpus_files:
+        with open(path) as file:
+            recorded_corpus += load_corpus(file)
+
+    reports = [
+        ('Default engines',
+         verify(generate_corpus(args.size, args.seed) + recorded_corpus)),
+        ('Glitch engines',
+         verify(
+             generate_corpus(args.size, args.seed, glitch_ratio=GLITCH_RATIO) +
+             recorded_corpus, glitch_engines(), 'glitch_filter')),
+    ]
+
+    for title, report in reports:
+        print(title)
+        for mismatch in report.mismatches:
+            print(mismatch)
+
+        throughput = report.throughput()
+        for engine, relative in report.relative_throughput().items():
+            print('{}: {:.0f} frames/s ({:.2f}x)'.format(
+                engine, throughput[engine], relative))
+
+        print('Passed' if report.passed else '{} mismatches'.
+              format(len(report.mismatches)))
+
+
+if __name__ == '__main__':
+    main()
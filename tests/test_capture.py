@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import unittest
+
+from irreceiver import NecDecoder, NecEncoder
+from irreceiver import capture
+from irreceiver.capture import CaptureWriter, CaptureReader, SimulatedEdgeSource, decode_frames, decode_worker, \
+    TICK_MASK
+
+
+class TestCaptureBus(unittest.TestCase):
+    codes = [0x00AD, 0x12EF, 0x7A1A, 0xFF00]
+
+    def setUp(self):
+        encoder = NecEncoder(typecode='H')
+        self.frames = [encoder.encode_code(code) for code in self.codes]
+        self.writer = None
+
+    def tearDown(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def _write(self, frames: list, start_tick: int = 0, **kwargs):
+        if self.writer is None:
+            self.writer = CaptureWriter(**kwargs)
+        SimulatedEdgeSource(frames, start_tick).run(self.writer)
+
+    def test_frame_pulses(self):
+        self._write(self.frames[:1])
+        reader = CaptureReader(self.writer.name, latest=False)
+        pulses = reader.read_frame()
+
+        assert len(pulses) == len(self.frames[0])
+        assert pulses[:] == self.frames[0].tolist()
+        assert pulses[-1] == self.frames[0][-1]
+        assert reader.read_frame() is None
+        reader.close()
+
+    def test_decode(self):
+        self._write([])
+        reader = CaptureReader(self.writer.name)
+        self._write(self.frames)
+
+        assert decode_frames(reader, NecDecoder()) == self.codes
+        assert reader.dropped_frames == 0
+        reader.close()
+
+    def test_tick_wraparound(self):
+        self._write(self.frames, TICK_MASK - 10000)
+        reader = CaptureReader(self.writer.name, latest=False)
+
+        assert decode_frames(reader, NecDecoder()) == self.codes
+        reader.close()
+
+    def test_short_frames_ignored(self):
+        self._write([[], [9000, 4500]])
+        reader = CaptureReader(self.writer.name, latest=False)
+
+        assert reader.read_frame()[:] == [9000, 4500]
+        assert reader.read_frame() is None
+        reader.close()
+
+    def test_lagging_reader(self):
+        self._write([], frame_capacity=3)
+        reader = CaptureReader(self.writer.name)
+        self._write(self.frames * 2)
+
+        # The slot of the next frame may be changing so only two of the three frames can be read
+        assert decode_frames(reader, NecDecoder()) == self.codes[2:]
+        assert reader.dropped_frames == 6
+        reader.close()
+
+    def test_edges_overwritten(self):
+        # Each frame has 68 edges so writing the second frame overwrites the first
+        self._write(self.frames[:2], edge_capacity=100)
+        reader = CaptureReader(self.writer.name, latest=False)
+
+        assert decode_frames(reader, NecDecoder()) == self.codes[1:2]
+        assert reader.dropped_frames == 1
+        reader.close()
+
+    def test_overwritten_while_decoding(self):
+        self._write(self.frames[:1], edge_capacity=100)
+        reader = CaptureReader(self.writer.name, latest=False)
+        pulses = reader.read_frame()
+        self._write(self.frames[1:2])
+
+        assert not reader.is_valid(pulses)
+        assert reader.dropped_frames == 1
+        reader.close()
+
+    def test_overwritten_frame_not_repeated(self):
+        self._write(self.frames[:1], edge_capacity=70)
+        reader = CaptureReader(self.writer.name, latest=False)
+        repeat_frames = [NecEncoder(typecode='H').repeat_message]
+
+        # A repeat message written while the first frame is decoded overwrites the edges of the first frame
+        def overwrite(pulses):
+            pulses = list(pulses)
+            self._write(repeat_frames)
+            repeat_frames.clear()
+            return pulses
+
+        decoder = NecDecoder()
+        decoder.decode(self.frames[1])
+        decoder.pulse_filter = overwrite
+
+        # The repeat message repeats the code before the overwritten frame
+        assert decode_frames(reader, decoder) == self.codes[1:2]
+        assert reader.dropped_frames == 1
+        reader.close()
+
+    def test_edge_written_not_published(self):
+        # The ring holds one frame of 68 edges and the edge after it
+        self._write(self.frames[:1], edge_capacity=69)
+        reader = CaptureReader(self.writer.name, latest=False)
+        pulses = reader.read_frame()
+
+        assert reader.is_valid(pulses)
+
+        # The next edge goes in the slot of the first edge of the frame and is stored before the sequence is updated
+        self.writer.add_edge(0)
+        capture._TICK.pack_into(self.writer._memory.buf,
+                                self.writer._edges_offset, 12345)
+
+        assert not reader.is_valid(pulses)
+        reader.close()
+
+    def test_frame_written_not_published(self):
+        self._write([], frame_capacity=2)
+        reader = CaptureReader(self.writer.name)
+        self._write(self.frames[:2])
+
+        # The next frame record goes in the slot of the first frame and is stored before the sequence is updated
+        capture._FRAME.pack_into(self.writer._memory.buf,
+                                 self.writer._frames_offset, 0, 0)
+
+        assert decode_frames(reader, NecDecoder()) == self.codes[1:2]
+        assert reader.dropped_frames == 1
+        reader.close()
+
+    def test_frame_too_long(self):
+        self._write(self.frames[:1], edge_capacity=68)
+        reader = CaptureReader(self.writer.name, latest=False)
+
+        assert reader.read_frame() is None
+        reader.close()
+
+    def test_shared_workers(self):
+        self._write(self.frames)
+        readers = [
+            CaptureReader(self.writer.name, index, 2, False)
+            for index in range(2)
+        ]
+
+        assert decode_frames(readers[0], NecDecoder()) == self.codes[::2]
+        assert decode_frames(readers[1], NecDecoder()) == self.codes[1::2]
+        for reader in readers:
+            reader.close()
+
+    def test_decode_worker_processes(self):
+        self._write(self.frames)
+        context = multiprocessing.get_context()
+        codes = context.Queue()
+        stop = context.Event()
+        stop.set()
+        workers = [
+            context.Process(target=decode_worker,
+                            args=(self.writer.name, codes, stop, index, 2),
+                            kwargs={'latest': False}) for index in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+
+        assert sorted(codes.get(timeout=5)
+                      for _ in self.codes) == sorted(self.codes)
+
+    def test_reader_process_exits(self):
+        self._write(self.frames)
+        attach = ('from irreceiver.capture import CaptureReader; '
+                  'CaptureReader({!r}).close()'.format(self.writer.name))
+        package_root = os.path.dirname(os.path.dirname(capture.__file__))
+        subprocess.run([sys.executable, '-c', attach],
+                       cwd=package_root,
+                       check=True,
+                       timeout=30)
+
+        # The bus must still exist after a reader process started on its own has exited
+        reader = CaptureReader(self.writer.name, latest=False)
+        assert decode_frames(reader, NecDecoder()) == self.codes
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import threading
+import unittest
+
+from irreceiver import dispatcher as dispatcher_module
+from irreceiver import Dispatcher, INVALID_FRAME, DROP_NEWEST, DROP_OLDEST, COALESCE
+
+
+class TestDispatcher(unittest.TestCase):
+    # Address 00h and command ADh as in the decoder tests
+    reference_number = 0x00AD
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.received = []
+
+    def _blocking_handler(self, code: int):
+        self.started.set()
+        self.release.wait(5)
+        self.received.append(code)
+
+    def _fill(self, dispatcher: Dispatcher, codes: list):
+        # The first code is taken by the worker which then blocks so the rest stay queued
+        dispatcher.dispatch(codes[0])
+        self.started.wait(5)
+        return [dispatcher.dispatch(code) for code in codes[1:]]
+
+    def test_register_dispatch(self):
+        dispatcher = Dispatcher()
+        dispatcher.register(0x00, 0xAD, self.received.append)
+
+        assert dispatcher.dispatch(TestDispatcher.reference_number)
+        dispatcher.close()
+
+        assert self.received == [TestDispatcher.reference_number]
+
+    def test_register_extended(self):
+        dispatcher = Dispatcher()
+        dispatcher.register(0xC001, 0xAD, self.received.append, True)
+        dispatcher.dispatch(0xC001AD)
+        dispatcher.close()
+
+        assert self.received == [0xC001AD]
+
+    def test_register_out_of_range(self):
+        dispatcher = Dispatcher()
+
+        with self.assertRaises(ValueError):
+            dispatcher.register(0x100, 0xAD, self.received.append)
+        dispatcher.close()
+
+    def test_unknown_code(self):
+        dispatcher = Dispatcher()
+        dispatcher.register(0x00, 0xAD, self.received.append)
+
+        assert not dispatcher.dispatch(0x01AD)
+        assert not dispatcher.dispatch(None)
+        dispatcher.close()
+
+        assert self.received == []
+
+    def test_default_handler(self):
+        dispatcher = Dispatcher(default_handler=self.received.append)
+        dispatcher.dispatch(INVALID_FRAME)
+        dispatcher.close()
+
+        assert self.received == [INVALID_FRAME]
+
+    def test_drop_newest(self):
+        dispatcher = Dispatcher(queue_size=1,
+                                policy=DROP_NEWEST,
+                                default_handler=self._blocking_handler)
+
+        assert self._fill(dispatcher, [1, 2, 3]) == [True, False]
+        self.release.set()
+        dispatcher.close()
+
+        assert self.received == [1, 2]
+        assert dispatcher.dropped == 1
+
+    def test_drop_oldest(self):
+        dispatcher = Dispatcher(queue_size=1,
+                                policy=DROP_OLDEST,
+                                default_handler=self._blocking_handler)
+
+        assert self._fill(dispatcher, [1, 2, 3]) == [True, True]
+        self.release.set()
+        dispatcher.close()
+
+        assert self.received == [1, 3]
+        assert dispatcher.dropped == 1
+
+    def test_coalesce(self):
+        dispatcher = Dispatcher(queue_size=4,
+                                policy=COALESCE,
+                                default_handler=self._blocking_handler)
+
+        assert self._fill(dispatcher, [1, 2, 2, 3]) == [True, False, True]
+        self.release.set()
+        dispatcher.close()
+
+        assert self.received == [1, 2, 3]
+        assert dispatcher.coalesced == 1
+
+    def test_dispatch_after_close(self):
+        dispatcher = Dispatcher(queue_size=1,
+                                policy=DROP_OLDEST,
+                                default_handler=self.received.append)
+        dispatcher.close()
+
+        assert not dispatcher.dispatch(1)
+        dispatcher.close()
+
+        assert self.received == []
+
+    def test_drop_oldest_keeps_stop(self):
+        dispatcher = Dispatcher(queue_size=1,
+                                policy=DROP_OLDEST,
+                                default_handler=self._blocking_handler)
+        self._fill(dispatcher, [1])
+
+        # A stop signal is queued as if close was running
+        dispatcher._queue.put_nowait(dispatcher_module._STOP)
+
+        assert not dispatcher.dispatch(2)
+        assert dispatcher.dropped == 1
+        self.release.set()
+        for thread in dispatcher._threads:
+            thread.join(5)
+            assert not thread.is_alive()
+
+        assert self.received == [1]
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            Dispatcher(policy=3)
+
+    def test_stats(self):
+        def failing_handler(_):
+            raise RuntimeError
+
+        dispatcher = Dispatcher()
+        dispatcher.register(0x00, 0xAD, self.received.append)
+        dispatcher.register(0x00, 0xAE, failing_handler)
+        dispatcher.dispatch(0x00AD)
+        dispatcher.dispatch(0x00AD)
+        dispatcher.dispatch(0x00AE)
+        dispatcher.close()
+
+        stats = dispatcher.stats[self.received.append]
+        assert stats.calls == 2
+        assert stats.errors == 0
+        assert stats.max_time >= stats.mean_time
+        assert dispatcher.stats[failing_handler].errors == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import unittest
+
+from irreceiver import NecDecoder, NecEncoder, FileSink, WaveformSink, REPEAT_MESSAGE
+from tests import test_irreceiver
+
+
+class ListSink(WaveformSink):
+    def __init__(self):
+        self.messages = []
+
+    def send(self, durations):
+        self.messages.append(durations)
+
+
+class TestNecEncoder(unittest.TestCase):
+    reference = test_irreceiver.TestNecDecoder
+
+    def test_encode_spec(self):
+        encoder = NecEncoder()
+
+        assert encoder.encode(
+            0x00, 0xAD).tolist() == TestNecEncoder.reference.reference_pulses
+
+    def test_encode_extended(self):
+        encoder = NecEncoder()
+
+        assert encoder.encode(0xC001, 0xAD, True).tolist(
+        ) == TestNecEncoder.reference.reference_pulses_extended
+
+    def test_encode_code(self):
+        encoder = NecEncoder()
+
+        assert encoder.encode_code(
+            TestNecEncoder.reference.reference_number) == encoder.encode(
+                0x00, 0xAD)
+
+    def test_encode_repeat(self):
+        encoder = NecEncoder()
+
+        assert encoder.repeat_message.tolist(
+        ) == TestNecEncoder.reference.reference_repeat_pulses
+
+    def test_round_trip(self):
+        encoder = NecEncoder()
+        decoder = NecDecoder()
+
+        for address in range(0, 0x100, 0x11):
+            for command in range(0x100):
+                assert decoder.decode(encoder.encode(
+                    address, command)) == address << 8 | command
+
+    def test_round_trip_extended(self):
+        encoder = NecEncoder()
+        decoder = NecDecoder(True)
+
+        for address in (0x0000, 0x00FF, 0x1234, 0xC001, 0xFFFF):
+            for command in range(0x100):
+                assert decoder.decode(encoder.encode(
+                    address, command, True)) == address << 8 | command
+
+    def test_round_trip_repeat(self):
+        encoder = NecEncoder()
+        decoder = NecDecoder()
+        code = decoder.decode(encoder.encode(0x12, 0x34))
+
+        assert decoder.decode(encoder.repeat_message) == code
+        assert decoder.current_message_type == REPEAT_MESSAGE
+
+    def test_integer_typecode(self):
+        encoder = NecEncoder(typecode='H')
+        durations = encoder.encode(0x00, 0xAD)
+
+        assert durations.itemsize == 2
+        assert durations[:4].tolist() == [9000, 4500, 562, 562]
+        assert NecDecoder().decode(
+            durations) == TestNecEncoder.reference.reference_number
+
+    def test_out_of_range(self):
+        encoder = NecEncoder()
+
+        with self.assertRaises(ValueError):
+            encoder.encode(0x100, 0xAD)
+        with self.assertRaises(ValueError):
+            encoder.encode(0x00, 0x100, True)
+
+    def test_cache(self):
+        encoder = NecEncoder(cache_size=1)
+        first = encoder.encode(0x00, 0xAD)
+
+        assert encoder.encode(0x00, 0xAD) is first
+        encoder.encode(0x00, 0xAE)
+        assert encoder.encode(0x00, 0xAD) is not first
+        assert encoder.cache_info().hits == 1
+
+    def test_send(self):
+        encoder = NecEncoder()
+        sink = ListSink()
+        encoder.send(sink, 0x00, 0xAD)
+        encoder.send_repeat(sink)
+
+        assert sink.messages == [
+            encoder.encode(0x00, 0xAD), encoder.repeat_message
+        ]
+
+    def test_file_sink(self):
+        encoder = NecEncoder()
+        file = io.StringIO()
+        encoder.send_repeat(FileSink(file))
+
+        assert file.getvalue() == '9000,2250,562.5\n'
+
+    def test_sink_without_send(self):
+        class NoSendSink(WaveformSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoSendSink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+from irreceiver import NecDecoder, GlitchFilter, filter_glitches
+from irreceiver import filters
+from tests import test_irreceiver
+
+
+class TestGlitchFilter(unittest.TestCase):
+    glitch = 50
+
+    # A glitch in the AGC burst, one in a one-bit space and one in the final burst
+    reference_pulses_glitches = (
+        test_irreceiver.TestNecDecoder.reference_pulses[:1] +
+        [glitch, glitch, 4500 - 2 * glitch] +
+        test_irreceiver.TestNecDecoder.reference_pulses[2:19] +
+        [800, glitch, 1687.5 - 800 - glitch] +
+        test_irreceiver.TestNecDecoder.reference_pulses[20:-1] +
+        [300, glitch, 562.5 - 300 - glitch])
+
+    def _check_filters(self, pulses: list, expected: list):
+        glitch_filter = GlitchFilter()
+        streamed = []
+        for pulse in pulses:
+            streamed.extend(glitch_filter.push(pulse))
+        streamed.extend(glitch_filter.flush())
+
+        assert streamed == expected
+        assert filters._filter_glitches_python(
+            pulses, filters.MIN_PULSE_WIDTH) == expected
+        assert filter_glitches(pulses) == expected
+
+    def test_no_glitches(self):
+        self._check_filters(test_irreceiver.TestNecDecoder.reference_pulses,
+                            test_irreceiver.TestNecDecoder.reference_pulses)
+
+    def test_merge(self):
+        self._check_filters([9000, 2000, 100, 2400, 562.5],
+                            [9000, 2000 + 100 + 2400, 562.5])
+
+    def test_consecutive_glitches(self):
+        # The second glitch is merged as the pulse after the first and the third is a new glitch
+        self._check_filters([562.5, 100, 100, 100, 100, 562.5],
+                            [562.5 + 100 * 4, 562.5])
+
+    def test_leading_glitches(self):
+        self._check_filters([100, 100, 9000, 4500], [9000, 4500])
+
+    def test_trailing_glitch(self):
+        self._check_filters([9000, 4500, 100], [9000, 4600])
+
+    def test_empty(self):
+        self._check_filters([], [])
+        self._check_filters([100], [])
+
+    def test_stream_reuse(self):
+        glitch_filter = GlitchFilter()
+        glitch_filter.push(9000)
+        glitch_filter.flush()
+
+        assert glitch_filter.push(100) == []
+        assert glitch_filter.flush() == []
+
+    def test_decode_glitches(self):
+        pulses = TestGlitchFilter.reference_pulses_glitches
+
+        assert NecDecoder().decode(
+            pulses) != test_irreceiver.TestNecDecoder.reference_number
+        assert NecDecoder(pulse_filter=filter_glitches).decode(
+            pulses) == test_irreceiver.TestNecDecoder.reference_number
+
+    @unittest.skipIf(filters.numpy is None, 'NumPy is not installed')
+    def test_numpy_matches_python(self):
+        pulses = [562.5, 100, 100, 1687.5, 100, 562.5, 100] * 10
+
+        assert filters._filter_glitches_numpy(
+            pulses,
+            filters.MIN_PULSE_WIDTH) == filters._filter_glitches_python(
+                pulses, filters.MIN_PULSE_WIDTH)
+
+    @unittest.skipIf(filters.numpy is None, 'NumPy is not installed')
+    def test_numpy_keeps_pulse_types(self):
+        for pulses in ([562, 100, 100, 1687, 100, 562, 100] * 50,
+                       [562.5, 100.0, 100.0, 1687.5] * 100):
+            numpy_pulses = filters._filter_glitches_numpy(
+                pulses, filters.MIN_PULSE_WIDTH)
+            python_pulses = filters._filter_glitches_python(
+                pulses, filters.MIN_PULSE_WIDTH)
+
+            assert numpy_pulses == python_pulses
+            assert [type(pulse) for pulse in numpy_pulses
+                    ] == [type(pulse) for pulse in python_pulses]
+
+    def test_short_pulses_use_python(self):
+        pulses = [562, 100, 100, 1687] * 10
+        assert len(pulses) < filters.NUMPY_MIN_PULSES
+
+        def fail(pulses, min_width):
+            raise AssertionError('NumPy used for a short list')
+
+        filter_numpy = filters._filter_glitches_numpy
+        filters._filter_glitches_numpy = fail
+        try:
+            filtered = filters.filter_glitches(pulses)
+        finally:
+            filters._filter_glitches_numpy = filter_numpy
+
+        assert filtered == [762, 1687] * 10
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from irreceiver import NecDecoder, INVALID_FRAME, REPEAT_MESSAGE, NEW_MESSAGE
+from irreceiver import NecDecoder, INVALID_FRAME, REPEAT_MESSAGE, NEW_MESSAGE, NEC_STANDARD, NEC_EXTENDED
 
 
 class TestNecDecoder(unittest.TestCase):
@@ -436,6 +436,61 @@ class TestNecDecoder(unittest.TestCase):
 
         assert code == repeat_response
 
+    # Detect the protocol for each frame
+    def test_decode_frame_auto_standard(self):
+        decoder = NecDecoder(None)
+
+        assert decoder.decode_frame(TestNecDecoder.reference_pulses) == (
+            TestNecDecoder.reference_number, NEC_STANDARD)
+
+    def test_decode_frame_auto_extended(self):
+        decoder = NecDecoder(None)
+
+        assert decoder.decode_frame(
+            TestNecDecoder.reference_pulses_extended) == (
+                TestNecDecoder.reference_pulses_extended_number, NEC_EXTENDED)
+
+    def test_decode_frame_fixed_standard(self):
+        decoder = NecDecoder()
+
+        assert decoder.decode_frame(
+            TestNecDecoder.reference_pulses_extended) == (INVALID_FRAME,
+                                                          INVALID_FRAME)
+
+    def test_decode_frame_auto_accepted(self):
+        decoder = NecDecoder(None, accepted_protocols=(NEC_STANDARD, ))
+
+        assert decoder.decode(
+            TestNecDecoder.reference_pulses_extended) == INVALID_FRAME
+        assert decoder.decode(
+            TestNecDecoder.reference_pulses) == TestNecDecoder.reference_number
+
+    def test_decode_frame_fixed_accepted(self):
+        standard_decoder = NecDecoder(accepted_protocols=(NEC_EXTENDED, ))
+        extended_decoder = NecDecoder(True,
+                                      accepted_protocols=(NEC_STANDARD, ))
+
+        assert standard_decoder.decode_frame(
+            TestNecDecoder.reference_pulses) == (INVALID_FRAME, INVALID_FRAME)
+        assert extended_decoder.decode_frame(
+            TestNecDecoder.reference_pulses_extended) == (INVALID_FRAME,
+                                                          INVALID_FRAME)
+
+    def test_decode_frame_auto_preferred(self):
+        # The standard reference frame has address 00h followed by its inverse FFh which is FF00h as an extended address
+        decoder = NecDecoder(None, preferred_protocols={0xFF00: NEC_EXTENDED})
+
+        assert decoder.decode_frame(
+            TestNecDecoder.reference_pulses) == (0xFF00AD, NEC_EXTENDED)
+
+    def test_decode_frame_repeat(self):
+        decoder = NecDecoder(None)
+        decoder.decode(TestNecDecoder.reference_pulses_extended)
+
+        assert decoder.decode_frame(
+            TestNecDecoder.reference_repeat_pulses) == (
+                TestNecDecoder.reference_pulses_extended_number, NEC_EXTENDED)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,110 @@
+import statistics
+import unittest
+
+from irreceiver import NecDecoder, NecEncoder, LinkMonitor, RunningStats, NEC_STANDARD, NEC_EXTENDED
+from tests import test_irreceiver
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_mean_variance(self):
+        values = [562.5, 600, 530, 562.5, 1687.5]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+
+        assert stats.count == len(values)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(values))
+
+    def test_empty(self):
+        stats = RunningStats()
+
+        assert stats.mean == 0
+        assert stats.variance == 0
+
+
+class TestLinkMonitor(unittest.TestCase):
+    reference_pulses = test_irreceiver.TestNecDecoder.reference_pulses
+    reference_repeat_pulses = test_irreceiver.TestNecDecoder.reference_repeat_pulses
+
+    def setUp(self):
+        self.time = 0
+        self.monitor = LinkMonitor(clock=lambda: self.time)
+        self.decoder = NecDecoder(monitor=self.monitor, receiver='living room')
+
+    def test_spec_frame(self):
+        self.decoder.decode(TestLinkMonitor.reference_pulses)
+        receiver = self.monitor.snapshot()['receivers']['living room']
+
+        assert receiver['frames'] == 1
+        assert receiver['accept_ratio'] == 1
+        assert receiver['mark_mean'] == 562.5
+        assert receiver['mark_variance'] == 0
+        assert receiver['zero_space_mean'] == 562.5
+        assert receiver['one_space_mean'] == 1687.5
+        assert receiver['worst_margin'] == 1
+
+    def test_address(self):
+        self.decoder.decode(TestLinkMonitor.reference_pulses)
+        self.decoder.decode(TestLinkMonitor.reference_repeat_pulses)
+        addresses = self.monitor.snapshot()['addresses']
+
+        assert list(addresses) == [(NEC_STANDARD, 0x00)]
+        assert addresses[(NEC_STANDARD, 0x00)]['frames'] == 2
+
+    def test_address_protocols(self):
+        # Extended address 0x0012 has the same code as standard address 0x12
+        encoder = NecEncoder()
+        decoder = NecDecoder(None, monitor=self.monitor)
+        decoder.decode(encoder.encode(0x12, 0xAD))
+        decoder.decode(encoder.encode(0x0012, 0xAD, True))
+        decoder.decode(encoder.repeat_message)
+        addresses = self.monitor.snapshot()['addresses']
+
+        assert sorted(addresses) == [(NEC_STANDARD, 0x12),
+                                     (NEC_EXTENDED, 0x12)]
+        assert addresses[(NEC_STANDARD, 0x12)]['frames'] == 1
+        assert addresses[(NEC_EXTENDED, 0x12)]['frames'] == 2
+
+    def test_margin(self):
+        # Move one mark half way to the edge of the tolerance
+        pulses = TestLinkMonitor.reference_pulses[:]
+        pulses[2] += 562.5 * self.decoder.timing_tolerance / 2
+        self.decoder.decode(pulses)
+        receiver = self.monitor.snapshot()['receivers']['living room']
+
+        self.assertAlmostEqual(receiver['worst_margin'], .5)
+        assert receiver['mark_variance'] > 0
+
+    def test_rejected_frames(self):
+        self.decoder.decode(TestLinkMonitor.reference_pulses)
+        self.decoder.decode(TestLinkMonitor.reference_pulses[1:])
+        self.decoder.decode(TestLinkMonitor.reference_pulses[:-1])
+        receiver = self.monitor.snapshot()['receivers']['living room']
+
+        assert receiver['frames'] == 3
+        assert receiver['accepted'] == 1
+        self.assertAlmostEqual(receiver['accept_ratio'], 1 / 3)
+        assert receiver['recent_accept_ratio'] < 1
+
+    def test_gaps(self):
+        for frame_time in (0, 100, 300):
+            self.time = frame_time
+            self.decoder.decode(TestLinkMonitor.reference_pulses)
+        receiver = self.monitor.snapshot()['receivers']['living room']
+
+        assert receiver['gap_mean'] == 150
+        assert receiver['gap_variance'] == 5000
+
+    def test_max_addresses(self):
+        monitor = LinkMonitor(max_addresses=0)
+        decoder = NecDecoder(monitor=monitor)
+        decoder.decode(TestLinkMonitor.reference_pulses)
+        snapshot = monitor.snapshot()
+
+        assert snapshot['addresses'] == {}
+        assert snapshot['receivers'][None]['accepted'] == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
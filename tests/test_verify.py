@@ -0,0 +1,129 @@
+import io
+import unittest
+from functools import partial
+
+from irreceiver import NecDecoder, NecEncoder, FileSink, INVALID_FRAME, REPEAT_MESSAGE, NEC_STANDARD, \
+    NEC_EXTENDED
+from irreceiver import filters, verify
+from tests import test_irreceiver
+
+
+class NoRepeatDecoder(NecDecoder):
+    # A broken engine which does not return the last code for repeat messages
+    def decode(self, pulse_times: list) -> int:
+        code = super().decode(pulse_times)
+        return INVALID_FRAME if self.current_message_type == REPEAT_MESSAGE else code
+
+
+class StandardLabelDecoder(NecDecoder):
+    # A broken engine which decodes the right codes but labels every frame as the standard protocol
+    def decode(self, pulse_times: list) -> int:
+        code = super().decode(pulse_times)
+        self.last_protocol = NEC_STANDARD
+        return code
+
+
+class TestVerify(unittest.TestCase):
+    reference = test_irreceiver.TestNecDecoder
+
+    def test_default_engines(self):
+        report = verify.verify(verify.generate_corpus(300))
+
+        assert report.passed, report.mismatches
+        assert set(report.times) == set(verify.default_engines())
+
+    def test_glitch_engines(self):
+        corpus = verify.generate_corpus(300, glitch_ratio=.5)
+        report = verify.verify(corpus, verify.glitch_engines(),
+                               'glitch_filter')
+
+        assert report.passed, report.mismatches
+
+        # The glitches change decoding so the comparison is not between two engines that do nothing
+        assert not verify.verify(corpus).passed
+
+    def test_glitch_engines_differ(self):
+        corpus = verify.generate_corpus(300, glitch_ratio=.5)
+        engines = verify.glitch_engines()
+        engines['wide_glitch_filter'] = lambda: NecDecoder(
+            pulse_filter=partial(filters.filter_glitches, min_width=400))
+
+        assert not verify.verify(corpus, engines, 'glitch_filter').passed
+
+    def test_extended_corpus(self):
+        corpus = verify.generate_corpus(100, extended_protocol=True)
+        report = verify.verify(
+            corpus, {
+                'reference':
+                lambda: NecDecoder(True),
+                'auto':
+                lambda: NecDecoder(None, accepted_protocols=(NEC_EXTENDED, ))
+            })
+
+        assert report.passed, report.mismatches
+
+    def test_protocol_mismatch(self):
+        corpus = verify.generate_corpus(20,
+                                        repeat_ratio=0,
+                                        corrupt_ratio=0,
+                                        extended_protocol=True)
+        engines = {
+            'reference': lambda: NecDecoder(True),
+            'broken': lambda: StandardLabelDecoder(True)
+        }
+        report = verify.verify(corpus, engines)
+
+        assert len(report.mismatches) == len(corpus)
+        mismatch = report.mismatches[0]
+        assert mismatch.expected[:3] == mismatch.actual[:3]
+        assert mismatch.expected[3] == NEC_EXTENDED
+        assert mismatch.actual[3] == NEC_STANDARD
+
+    def test_generate_corpus_seed(self):
+        assert verify.generate_corpus(20, 1) == verify.generate_corpus(20, 1)
+        assert verify.generate_corpus(20, 1) != verify.generate_corpus(20, 2)
+
+    def test_load_corpus(self):
+        encoder = NecEncoder()
+        file = io.StringIO()
+        sink = FileSink(file)
+        encoder.send(sink, 0x00, 0xAD)
+        encoder.send_repeat(sink)
+        file.seek(0)
+
+        assert verify.load_corpus(file) == [
+            TestVerify.reference.reference_pulses,
+            TestVerify.reference.reference_repeat_pulses
+        ]
+
+    def test_mismatch_shrunk(self):
+        repeat_pulses = [
+            562.5, 562.5
+        ] + TestVerify.reference.reference_repeat_pulses + [562.5] * 4
+        corpus = [TestVerify.reference.reference_pulses, repeat_pulses]
+        report = verify.verify(corpus, {
+            'reference': NecDecoder,
+            'broken': NoRepeatDecoder
+        })
+
+        assert not report.passed
+        assert len(report.mismatches) == 1
+        mismatch = report.mismatches[0]
+        assert mismatch.engine == 'broken'
+        assert mismatch.index == 1
+        assert mismatch.expected[0] == TestVerify.reference.reference_number
+        assert mismatch.actual[0] == INVALID_FRAME
+        assert mismatch.shrunk_pulses == [9000, 2250]
+
+    def test_relative_throughput(self):
+        report = verify.verify(verify.generate_corpus(50), {
+            'reference': NecDecoder,
+            'copy': NecDecoder
+        })
+
+        assert report.relative_throughput()['reference'] == 1
+        assert set(report.throughput()) == {'reference', 'copy'}
+
+
+if __name__ == '__main__':
+    unittest.main()